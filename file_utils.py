@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+文件写入工具 - main、parser_openai、web_renderer 共用
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+# mkstemp 创建的文件权限为 0600，写入后按当前 umask 恢复普通文件的默认权限
+# （导入时读取一次：os.umask 只能通过设置来读取，运行中调用不是线程安全的）
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+_FILE_MODE = 0o666 & ~_UMASK
+
+
+def write_bytes_atomic(path: Path, data: bytes) -> None:
+    """
+    一次性写入字节数据：先写临时文件再原子替换，读取方不会看到写了一半的文件
+
+    每次写入使用同目录下唯一的临时文件，多个线程同时写同一个目标时互不干扰。
+    写入失败时删除临时文件并重新抛出异常，目标文件保持原样。
+
+    Args:
+        path: 目标文件路径（所在目录需已存在）
+        data: 要写入的字节数据
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_name, _FILE_MODE)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
@@ -10,34 +10,47 @@
 
 import argparse
 import configparser
+import functools
 import json
 import sys
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-# 模块导入
-from parser_openai import parse_holiday_text, validate_holiday_data
-from web_renderer import WebCalendarRenderer
+from file_utils import write_bytes_atomic
+
+# 注意：parser_openai (openai) 与 web_renderer (playwright) 导入开销较大，
+# 在使用它们的函数内延迟导入，使 --help 等路径无需加载这些依赖
 
 
 # 配置文件路径
 CONFIG_FILE = Path(__file__).parent / "config.ini"
 
 
-def load_config(config_path: Path = CONFIG_FILE) -> configparser.ConfigParser:
-    """加载配置文件"""
-    config = configparser.ConfigParser()
-    if config_path.exists():
-        config.read(config_path, encoding="utf-8")
-    else:
+@functools.lru_cache(maxsize=4)
+def _load_config_cached(config_path: str, mtime_ns: int) -> configparser.RawConfigParser:
+    """按 (路径, 修改时间) 缓存解析后的配置，文件被修改后自动重新读取"""
+    config = configparser.RawConfigParser()
+    config.read_string(Path(config_path).read_text(encoding="utf-8"), source=config_path)
+    return config
+
+
+def load_config(config_path: Path = CONFIG_FILE) -> configparser.RawConfigParser:
+    """
+    加载配置文件
+
+    配置文件未修改时返回缓存的同一个对象，调用方只读取、不要修改其内容
+    """
+    try:
+        return _load_config_cached(str(config_path), config_path.stat().st_mtime_ns)
+    except FileNotFoundError:
         raise FileNotFoundError(
             f"配置文件不存在: {config_path}\n"
             f"请复制 config.ini.example 为 config.ini 并填入您的 API Key"
-        )
-    return config
+        ) from None
 
 
-def get_api_key(config: configparser.ConfigParser) -> str:
+def get_api_key(config: configparser.RawConfigParser) -> str:
     """从配置文件获取 API Key"""
     api_key = config.get("api", "api_key", fallback="")
     if not api_key or api_key == "YOUR_API_KEY_HERE":
@@ -55,6 +68,9 @@ def generate_calendar_v2(
     save_html: bool = False,
     parser_model: str = "deepseek-v3.2",
     cache_dir: Path = None,
+    use_cache: bool = True,
+    timestamp: str | None = None,
+    image_format: str = "png",
 ) -> bytes:
     """
     日历生成流程：解析 → 渲染
@@ -66,29 +82,53 @@ def generate_calendar_v2(
         save_json: 是否保存解析后的 JSON 数据
         save_html: 是否保存 HTML 文件
         parser_model: 文本解析模型
-        cache_dir: 缓存文件存放目录，默认为脚本根目录下的 tmp 文件夹
+        cache_dir: 缓存文件存放目录（需已存在），默认为脚本根目录下的 tmp 文件夹
+        use_cache: 是否读取解析结果缓存（缓存存放在 cache_dir/llm_cache）；
+            为 False 时强制调用 API，并用新的结果刷新缓存
+        timestamp: 缓存文件名使用的时间戳，默认取当前时间
+        image_format: 图片格式（png 或 jpeg）
 
     Returns:
         图片二进制数据
     """
+    from parser_openai import check_holiday_text, parse_holiday_text, validate_holiday_data
+    from web_renderer import WebCalendarRenderer
+
+    # 明显不是放假通知的文本在启动浏览器之前直接报错
+    check_holiday_text(holiday_text)
 
     # 设置默认缓存目录
     if cache_dir is None:
         cache_dir = Path(__file__).parent / "tmp"
-    # 确保缓存目录存在
-    cache_dir.mkdir(parents=True, exist_ok=True)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+    # 本次运行的所有缓存文件共用同一个时间戳
+    if timestamp is None:
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
 
     # Step 1: 解析放假文本为结构化 JSON
     print("=" * 50)
     print("Step 1: 解析放假通知文本...")
     print("=" * 50)
 
-    holiday_data = parse_holiday_text(
-        holiday_text=holiday_text,
-        api_key=api_key,
-        base_url=parser_base_url,
-        model=parser_model
-    )
+    # API 解析在后台线程执行，同时在当前线程预启动浏览器，
+    # 让浏览器冷启动与网络等待重叠（Playwright 同步 API 需留在渲染线程）
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        parse_future = executor.submit(
+            parse_holiday_text,
+            holiday_text=holiday_text,
+            api_key=api_key,
+            base_url=parser_base_url,
+            model=parser_model,
+            cache_dir=cache_dir,
+            refresh_cache=not use_cache
+        )
+        try:
+            WebCalendarRenderer.warmup()
+        except Exception:
+            # 预启动失败（例如未安装浏览器）不影响解析和 --save-json，渲染时会再次报告错误
+            pass
+        holiday_data = parse_future.result()
 
     # 验证数据
     validate_holiday_data(holiday_data)
@@ -102,10 +142,11 @@ def generate_calendar_v2(
 
     # 保存 JSON 数据
     if save_json:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         json_path = cache_dir / f"holiday_data_{timestamp}.json"
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(holiday_data, f, ensure_ascii=False, indent=2)
+        write_bytes_atomic(
+            json_path,
+            json.dumps(holiday_data, ensure_ascii=False, indent=2).encode("utf-8")
+        )
         print(f"  JSON 已保存: {json_path}")
 
     # Step 2: 渲染日历
@@ -117,38 +158,148 @@ def generate_calendar_v2(
     web_renderer = WebCalendarRenderer(holiday_data)
 
     # 生成临时文件路径
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
     if save_html:
         html_path = cache_dir / f"calendar_{timestamp}.html"
     else:
         html_path = None
 
-    # 渲染并截图
-    screenshot_path = web_renderer.render(
-        output_path=cache_dir / f"calendar_web_{timestamp}.png",
+    # 渲染并截图（截图数据直接在内存中返回，不写入缓存目录）
+    image_data = web_renderer.render(
+        output_path=None,
         width=1400,
         height=1000,
         save_html=save_html,
-        html_path=html_path
+        html_path=html_path,
+        image_format=image_format
     )
 
-    # 读取截图数据
-    with open(screenshot_path, "rb") as f:
-        image_data = f.read()
-
     return image_data
 
 
+def generate_calendars_batch(
+    holiday_texts: list[str],
+    api_key: str,
+    parser_base_url: str = "https://aihubmix.com/v1",
+    parser_model: str = "deepseek-v3.2",
+    cache_dir: Path = None,
+    use_cache: bool = True,
+    concurrency: int = 3,
+    image_format: str = "png",
+) -> list[bytes | None]:
+    """
+    批量生成日历：并发解析多条放假通知，再复用同一个浏览器批量渲染
+
+    解析以网络等待为主且各条之间互不依赖，并发执行后总耗时接近最慢的一次调用；
+    渲染使用 Playwright 同步 API，在当前线程中同时打开多个页面加载，再依次截图。
+
+    Args:
+        holiday_texts: 放假通知文本列表
+        api_key: API Key
+        parser_base_url: Parser API 基础 URL (OpenAI 兼容)
+        parser_model: 文本解析模型
+        cache_dir: 缓存文件存放目录（需已存在），默认为脚本根目录下的 tmp 文件夹
+        use_cache: 是否读取解析结果缓存（为 False 时强制调用 API 并刷新缓存）
+        concurrency: 同时进行的 API 解析请求数
+        image_format: 图片格式（png 或 jpeg）
+
+    Returns:
+        与 holiday_texts 一一对应的图片二进制数据，解析或渲染失败的项为 None
+    """
+    from parser_openai import check_holiday_text, parse_holiday_text, validate_holiday_data
+    from web_renderer import WebCalendarRenderer
+
+    # 设置默认缓存目录
+    if cache_dir is None:
+        cache_dir = Path(__file__).parent / "tmp"
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+    # Step 1: 并发解析
+    print("=" * 50)
+    print(f"Step 1: 并发解析 {len(holiday_texts)} 条放假通知 (并发数: {concurrency})...")
+    print("=" * 50)
+
+    holiday_datas = []
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        # 明显不是放假通知的文本不提交解析，对应位置直接记录错误
+        futures = []
+        for text in holiday_texts:
+            try:
+                check_holiday_text(text)
+            except ValueError as e:
+                futures.append(e)
+                continue
+            futures.append(executor.submit(
+                parse_holiday_text,
+                holiday_text=text,
+                api_key=api_key,
+                base_url=parser_base_url,
+                model=parser_model,
+                cache_dir=cache_dir,
+                refresh_cache=not use_cache
+            ))
+
+        # 等待解析期间预启动浏览器（全部被排除时无需启动；失败时不影响解析，渲染时会再次报告错误）
+        if not all(isinstance(future, Exception) for future in futures):
+            try:
+                WebCalendarRenderer.warmup()
+            except Exception:
+                pass
+
+        for index, future in enumerate(futures, start=1):
+            try:
+                if isinstance(future, Exception):
+                    raise future
+                holiday_data = future.result()
+                validate_holiday_data(holiday_data)
+            except Exception as e:
+                print(f"  [{index}] 解析失败: {e}", file=sys.stderr)
+                holiday_data = None
+            else:
+                print(f"  [{index}] {holiday_data['holiday_name']}: "
+                      f"{holiday_data.get('start_date', '')} ~ {holiday_data.get('end_date', '')}")
+            holiday_datas.append(holiday_data)
+
+    # Step 2: 批量渲染（同一个浏览器中多个页面同时加载）
+    print("\n" + "=" * 50)
+    print("Step 2: 使用 FullCalendar 渲染日历...")
+    print("=" * 50)
+
+    images = iter(WebCalendarRenderer.render_many(
+        [holiday_data for holiday_data in holiday_datas if holiday_data is not None],
+        width=1400,
+        height=1000,
+        return_exceptions=True,
+        image_format=image_format
+    ))
+
+    results = []
+    for index, holiday_data in enumerate(holiday_datas, start=1):
+        if holiday_data is None:
+            results.append(None)
+            continue
+        image_data = next(images)
+        if isinstance(image_data, Exception):
+            print(f"  [{index}] 渲染失败: {image_data}", file=sys.stderr)
+            image_data = None
+        results.append(image_data)
+
+    return results
+
+
 def save_image(image_data: bytes, output_path: Path) -> None:
     """保存图片到文件"""
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, "wb") as f:
-        f.write(image_data)
+    if not output_path.parent.exists():
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+    write_bytes_atomic(output_path, image_data)
     print(f"图片已保存: {output_path.absolute()}")
 
 
-def generate_output_filename(holiday_text: str, output_dir: Path, format: str = "png") -> Path:
+def generate_output_filename(
+    holiday_text: str,
+    output_dir: Path,
+    format: str = "png",
+    timestamp: str | None = None,
+) -> Path:
     """
     根据放假通知生成输出文件名
 
@@ -156,11 +307,13 @@ def generate_output_filename(holiday_text: str, output_dir: Path, format: str =
         holiday_text: 放假通知文本
         output_dir: 输出目录
         format: 图片格式
+        timestamp: 文件名使用的时间戳，默认取当前时间
 
     Returns:
         输出文件路径
     """
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    if timestamp is None:
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
     filename = f"holiday_calendar_{timestamp}.{format}"
     return output_dir / filename
 
@@ -189,6 +342,9 @@ def parse_arguments() -> argparse.Namespace:
 
   # 从 JSON 文件渲染并保存 HTML
   python main.py --load-json tmp/holiday_data_20251224_154630.json --save-html -o output.png
+
+  # 批量模式（文件中每行一条放假通知，-o 指定输出目录）
+  python main.py --batch holidays.txt -o output/
         """
     )
 
@@ -237,6 +393,13 @@ def parse_arguments() -> argparse.Namespace:
         help="缓存文件存放目录 (默认: 脚本根目录下的 tmp 文件夹)",
     )
 
+    parser.add_argument(
+        "--no-cache",
+        action="store_false",
+        dest="use_cache",
+        help="不读取解析结果缓存，强制重新调用 API 解析（新的结果会覆盖缓存）",
+    )
+
     parser.add_argument(
         "--load-json",
         type=Path,
@@ -244,6 +407,13 @@ def parse_arguments() -> argparse.Namespace:
         help="从 JSON 文件加载数据（跳过 API 解析，用于快速调试渲染）",
     )
 
+    parser.add_argument(
+        "--batch",
+        type=Path,
+        help="批量模式：从文本文件读取多条放假通知（每行一条），并发解析后批量渲染；"
+             "此时 -o 指定输出目录，不能与放假通知文本、--load-json、--save-json、--save-html 同时使用",
+    )
+
     return parser.parse_args()
 
 
@@ -251,6 +421,8 @@ def render_from_json(
     json_path: Path,
     save_html: bool = False,
     cache_dir: Path = None,
+    timestamp: str | None = None,
+    image_format: str = "png",
 ) -> bytes:
     """
     从 JSON 文件直接渲染日历（跳过 API 解析）
@@ -258,15 +430,20 @@ def render_from_json(
     Args:
         json_path: JSON 文件路径
         save_html: 是否保存 HTML 文件
-        cache_dir: 缓存文件存放目录
+        cache_dir: 缓存文件存放目录（需已存在）
+        timestamp: HTML 文件名使用的时间戳，默认取当前时间
+        image_format: 图片格式（png 或 jpeg）
 
     Returns:
         图片二进制数据
     """
+    from parser_openai import validate_holiday_data
+    from web_renderer import WebCalendarRenderer
+
     # 设置默认缓存目录
     if cache_dir is None:
         cache_dir = Path(__file__).parent / "tmp"
-    cache_dir.mkdir(parents=True, exist_ok=True)
+        cache_dir.mkdir(parents=True, exist_ok=True)
 
     # 读取 JSON 数据
     print(f"从 JSON 文件加载数据: {json_path}")
@@ -284,24 +461,23 @@ def render_from_json(
     print("\n渲染日历...")
     web_renderer = WebCalendarRenderer(holiday_data)
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    if timestamp is None:
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
     if save_html:
         html_path = cache_dir / f"calendar_{timestamp}.html"
     else:
         html_path = None
 
     # 渲染并截图
-    screenshot_path = web_renderer.render(
-        output_path=cache_dir / f"calendar_web_{timestamp}.png",
+    return web_renderer.render(
+        output_path=None,
         width=None,  # 自动计算宽度
         height=1000,
         save_html=save_html,
-        html_path=html_path
+        html_path=html_path,
+        image_format=image_format
     )
 
-    with open(screenshot_path, "rb") as f:
-        return f.read()
-
 
 def main() -> int:
     """主函数"""
@@ -310,8 +486,20 @@ def main() -> int:
     try:
         # 设置缓存目录
         cache_dir = args.cache_dir or (Path(__file__).parent / "tmp")
+        # 只在启动时确保一次缓存目录存在，下游函数直接使用
         cache_dir.mkdir(parents=True, exist_ok=True)
 
+        # 本次运行生成的所有文件共用同一个时间戳
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+
+        # 截图格式（命令行中的 jpg 对应浏览器截图的 jpeg）
+        image_format = "jpeg" if args.format == "jpg" else "png"
+
+        # 批量模式只输出图片，不接受单条文本、--load-json 及 --save-json/--save-html
+        if args.batch and (args.holiday_text or args.load_json or args.save_json or args.save_html):
+            print("错误: --batch 不能与放假通知文本、--load-json、--save-json 或 --save-html 同时使用", file=sys.stderr)
+            return 1
+
         # 模式1: 从 JSON 文件加载（调试模式）
         if args.load_json:
             if not args.load_json.exists():
@@ -322,22 +510,22 @@ def main() -> int:
                 json_path=args.load_json,
                 save_html=args.save_html,
                 cache_dir=cache_dir,
+                timestamp=timestamp,
+                image_format=image_format,
             )
 
             # 确定输出路径
             if args.output:
                 output_path = args.output
             else:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                output_path = cache_dir / f"calendar_{timestamp}.png"
+                output_path = cache_dir / f"calendar_{timestamp}.{args.format}"
 
             save_image(image_data, output_path)
             return 0
 
-        # 模式2: 正常流程（文本 → API解析 → 渲染）
         # 检查必需参数
-        if not args.holiday_text:
-            print("错误: 请提供放假通知文本，或使用 --load-json 从 JSON 文件加载", file=sys.stderr)
+        if not args.holiday_text and not args.batch:
+            print("错误: 请提供放假通知文本，或使用 --load-json 从 JSON 文件加载、--batch 批量处理", file=sys.stderr)
             print("使用 python main.py --help 查看帮助", file=sys.stderr)
             return 1
 
@@ -354,6 +542,45 @@ def main() -> int:
         # 输出配置
         output_dir_str = config.get("output", "output_dir", fallback="")
 
+        # 模式2: 批量模式（多条文本 → 并发 API 解析 → 批量渲染）
+        if args.batch:
+            holiday_texts = [
+                line.strip()
+                for line in args.batch.read_text(encoding="utf-8").splitlines()
+                if line.strip()
+            ]
+            if not holiday_texts:
+                print(f"错误: 批量文件中没有放假通知文本: {args.batch}", file=sys.stderr)
+                return 1
+
+            results = generate_calendars_batch(
+                holiday_texts=holiday_texts,
+                api_key=api_key,
+                parser_base_url=parser_base_url,
+                parser_model=parser_model,
+                cache_dir=cache_dir,
+                use_cache=args.use_cache,
+                concurrency=config.getint("parser", "concurrency", fallback=3),
+                image_format=image_format,
+            )
+
+            # 批量模式下 -o 表示输出目录
+            if args.output:
+                output_dir = args.output
+            else:
+                output_dir = Path(output_dir_str) if output_dir_str else Path.cwd()
+
+            failed = 0
+            for index, image_data in enumerate(results, start=1):
+                if image_data is None:
+                    failed += 1
+                    continue
+                save_image(image_data, output_dir / f"holiday_calendar_{timestamp}_{index:02d}.{args.format}")
+
+            print(f"批量处理完成: 成功 {len(results) - failed} 条，失败 {failed} 条")
+            return 1 if failed else 0
+
+        # 模式3: 正常流程（文本 → API解析 → 渲染）
         # 生成图片
         image_data = generate_calendar_v2(
             holiday_text=args.holiday_text,
@@ -363,6 +590,9 @@ def main() -> int:
             save_html=args.save_html,
             parser_model=parser_model,
             cache_dir=cache_dir,
+            use_cache=args.use_cache,
+            timestamp=timestamp,
+            image_format=image_format,
         )
 
         # 确定输出路径
@@ -370,7 +600,7 @@ def main() -> int:
             output_path = args.output
         else:
             output_dir = Path(output_dir_str) if output_dir_str else Path.cwd()
-            output_path = generate_output_filename(args.holiday_text, output_dir, args.format)
+            output_path = generate_output_filename(args.holiday_text, output_dir, args.format, timestamp)
 
         # 保存图片
         save_image(image_data, output_path)
@@ -381,7 +611,7 @@ def main() -> int:
         print(f"错误: {e}", file=sys.stderr)
         return 1
     except ValueError as e:
-        print(f"配置错误: {e}", file=sys.stderr)
+        print(f"错误: {e}", file=sys.stderr)
         return 1
     except Exception as e:
         print(f"生成失败: {e}", file=sys.stderr)
@@ -4,12 +4,11 @@
 使用 AI 将放假文字描述解析为结构化 JSON 数据
 """
 
+import functools
 import json
 import re
 from typing import Any, Dict
 
-from google import genai
-
 # JSON Schema 定义
 HOLIDAY_SCHEMA = {
     "type": "object",
@@ -47,7 +46,8 @@ HOLIDAY_SCHEMA = {
 }
 
 # 解析提示词模板
-PARSER_PROMPT = """你是一个专业的放假通知解析助手。请从用户提供的放假通知文本中提取结构化信息，并严格按照 JSON Schema 返回数据。
+# 系统指令：规则和 Schema 固定不变，放在 system_instruction 中便于服务端前缀缓存
+SYSTEM_INSTRUCTION = """你是一个专业的放假通知解析助手。请从用户提供的放假通知文本中提取结构化信息，并严格按照 JSON Schema 返回数据。
 
 **重要要求：**
 1. 只返回纯 JSON 格式，不要包含任何解释文字
@@ -55,15 +55,34 @@ PARSER_PROMPT = """你是一个专业的放假通知解析助手。请从用户
 3. holiday_dates 必须包含从 start_date 到 end_date 之间的所有放假日期
 4. 如果有调休安排，必须包含在 makeup_workdays 中
 5. calendar_months 应该包含日历需要显示的所有月份
+6. 返回紧凑的单行 JSON（不换行、不缩进），不要使用代码块标记
 
 JSON Schema:
 {schema}
+"""
 
-放假通知文本：
+# 用户提示词：每次只发送放假通知文本
+USER_PROMPT = """放假通知文本：
 {holiday_text}
 
-请直接返回 JSON 数据（不要使用代码块标记）：
-"""
+请直接返回 JSON 数据："""
+
+# 放假通知的特征（日期、天数或关键词），用于在调用 API 前快速排除明显无关的输入
+# 与 parser_openai._HINT_RE 保持一致（此处不导入 parser_openai，避免加载 openai）
+_HINT_RE = re.compile(
+    r"\d{1,2}\s*月|\d{4}\s*[-/.年]|\d{1,2}\s*[./]\s*\d{1,2}|\d+\s*天"
+    r"|放假|调休|休假|休息|补班|上班|holiday|day off",
+    re.I
+)
+
+# 日期格式校验 (YYYY-MM-DD)
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+# 预先序列化的紧凑 Schema，并提前填入系统指令（Schema 中含有花括号，之后不能再用 format）
+_SCHEMA_JSON = json.dumps(HOLIDAY_SCHEMA, ensure_ascii=False, separators=(",", ":"))
+_SYSTEM_INSTRUCTION = SYSTEM_INSTRUCTION.replace("{schema}", _SCHEMA_JSON)
+
+_JSON_DECODER = json.JSONDecoder()
 
 
 def _extract_json_from_text(text: str) -> Dict[str, Any]:
@@ -74,32 +93,69 @@ def _extract_json_from_text(text: str) -> Dict[str, Any]:
     - 纯 JSON
     - Markdown 代码块包裹的 JSON (```json ... ```)
     - 其他格式包裹的 JSON
+
+    只做一次线性扫描：去掉代码块标记后，从第一个 { 开始用 raw_decode 解析，
+    JSON 对象之后的多余文本会被忽略
     """
     text = text.strip()
 
-    # 尝试去除 markdown 代码块标记
-    patterns = [
-        r"```json\s*([\s\S]*?)\s*```",  # ```json ... ```
-        r"```\s*([\s\S]*?)\s*```",      # ``` ... ```
-        r"\{[\s\S]*\}",                 # 直接查找 JSON 对象
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, text)
-        if match:
-            json_text = match.group(1) if match.lastindex else match.group(0)
-            try:
-                return json.loads(json_text)
-            except json.JSONDecodeError:
-                continue
-
-    # 如果以上都失败，尝试直接解析
+    # 快速路径：模型按要求直接返回纯 JSON
+    if text.startswith("{"):
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            pass
+
+    # 去除 markdown 代码块标记
+    if text.startswith("```"):
+        body = text[3:]
+        if body.startswith("json"):
+            body = body[4:]
+        fence_end = body.rfind("```")
+        if fence_end != -1:
+            body = body[:fence_end]
+        text = body.strip()
+
+    start = text.find("{")
     try:
-        return json.loads(text)
+        if start == -1:
+            # 没有找到 JSON 对象，尝试直接解析
+            return json.loads(text)
+        data, _ = _JSON_DECODER.raw_decode(text, start)
+        return data
     except json.JSONDecodeError as e:
         raise ValueError(f"无法从响应中提取有效的 JSON 数据: {e}\n原始文本: {text}")
 
 
+@functools.lru_cache(maxsize=4)
+def _get_client(api_key: str, base_url: str):
+    """
+    获取 Gemini 客户端（按 api_key/base_url 缓存，api_key 会保留在进程内存中）
+
+    复用同一个客户端可以保持底层 HTTP 连接池，避免每次调用都重新握手
+    """
+    # google.genai 依赖较重（grpc/protobuf/pydantic），仅在真正调用时导入
+    from google import genai
+
+    return genai.Client(
+        api_key=api_key,
+        http_options={"base_url": base_url}
+    )
+
+
+def check_holiday_text(holiday_text: str) -> None:
+    """
+    调用 API 前的快速检查：明显不是放假通知的文本直接报错，省去一次 API 往返
+
+    与 parser_openai.check_holiday_text 规则相同，修改时需同步。
+
+    Raises:
+        ValueError: 文本中既没有日期也没有放假相关的关键词时
+    """
+    if len(holiday_text.strip()) < 4 or not _HINT_RE.search(holiday_text):
+        raise ValueError("输入文本不像放假通知，至少需要包含日期或“放假/调休/休息”等关键词")
+
+
 def parse_holiday_text(
     holiday_text: str,
     api_key: str,
@@ -129,23 +185,20 @@ def parse_holiday_text(
             - notes: 额外备注
 
     Raises:
-        ValueError: 当无法解析 JSON 数据时
+        ValueError: 当输入文本不像放假通知，或无法解析 JSON 数据时
         RuntimeError: 当 API 调用失败时
     """
-    client = genai.Client(
-        api_key=api_key,
-        http_options={"base_url": base_url}
-    )
+    check_holiday_text(holiday_text)
 
-    prompt = PARSER_PROMPT.format(
-        schema=json.dumps(HOLIDAY_SCHEMA, ensure_ascii=False, indent=2),
-        holiday_text=holiday_text
-    )
+    client = _get_client(api_key, base_url)
+
+    prompt = USER_PROMPT.replace("{holiday_text}", holiday_text)
 
     try:
         response = client.models.generate_content(
             model=model,
             contents=prompt,
+            config={"system_instruction": _SYSTEM_INSTRUCTION},
         )
 
         # 提取并解析 JSON
@@ -182,14 +235,13 @@ def validate_holiday_data(data: Dict[str, Any]) -> bool:
             raise ValueError(f"缺少必需字段: {field}")
 
     # 验证日期格式
-    date_pattern = r"^\d{4}-\d{2}-\d{2}$"
     for date_field in ["start_date", "end_date"]:
-        if not re.match(date_pattern, data[date_field]):
+        if not _DATE_RE.match(data[date_field]):
             raise ValueError(f"{date_field} 日期格式错误，应为 YYYY-MM-DD")
 
     # 验证 holiday_dates 中的每个日期
     for date in data["holiday_dates"]:
-        if not re.match(date_pattern, date):
+        if not _DATE_RE.match(date):
             raise ValueError(f"holiday_dates 中的日期格式错误: {date}")
 
     # 验证 makeup_workdays 中的日期
@@ -197,7 +249,7 @@ def validate_holiday_data(data: Dict[str, Any]) -> bool:
         for makeup in data["makeup_workdays"]:
             if "date" not in makeup:
                 raise ValueError("makeup_workdays 中的项缺少 date 字段")
-            if not re.match(date_pattern, makeup["date"]):
+            if not _DATE_RE.match(makeup["date"]):
                 raise ValueError(f"makeup_workdays 中的日期格式错误: {makeup['date']}")
 
     return True
@@ -10,13 +10,22 @@
 - 上下文增强：传入参考年份防止跨年错误
 """
 
+import copy
 import datetime
+import functools
+import hashlib
 import json
 import re
-from typing import Any, Dict
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
 
 from openai import OpenAI
 
+from file_utils import write_bytes_atomic
+
 # JSON Schema 定义（改进版）
 HOLIDAY_SCHEMA = {
     "type": "object",
@@ -84,13 +93,9 @@ HOLIDAY_SCHEMA = {
 }
 
 # 解析提示词模板（改进版）
+# 固定的规则和 Schema 放在最前面、每次变化的输入放在最后，便于服务端的提示词前缀缓存命中
 PARSER_PROMPT = """你是一个专业的节假日排班数据解析专家。你的任务是将非结构化的放假通知文本转换为下游画图工具可用的精确 JSON 数据。
 
-**输入上下文：**
-参考年份：{current_year} (如果文本中未指明年份，请默认使用此年份)
-当前文本：
-{holiday_text}
-
 **解析步骤与规则（请严格遵守）：**
 
 1. **日期计算逻辑：**
@@ -112,9 +117,130 @@ PARSER_PROMPT = """你是一个专业的节假日排班数据解析专家。你
 **目标 JSON Schema：**
 {schema}
 
+**输入上下文：**
+参考年份：{current_year} (如果文本中未指明年份，请默认使用此年份)
+当前文本：
+{holiday_text}
+
 请直接返回 JSON 数据：
 """
 
+# Schema 是固定的，导入时序列化一次并填入模板
+_SCHEMA_JSON = json.dumps(HOLIDAY_SCHEMA, ensure_ascii=False, indent=2)
+_PROMPT_WITH_SCHEMA = PARSER_PROMPT.replace("{schema}", _SCHEMA_JSON)
+
+# 按占位符预先切分，调用时只需拼接：前缀 + 年份 + 中段 + 通知文本 + 后缀
+_PROMPT_PREFIX, _rest = _PROMPT_WITH_SCHEMA.split("{current_year}")
+_PROMPT_MIDDLE, _PROMPT_SUFFIX = _rest.split("{holiday_text}")
+del _rest
+
+
+def _build_prompt(current_year: int, holiday_text: str) -> str:
+    """填入参考年份和通知文本，生成完整的解析提示词"""
+    return f"{_PROMPT_PREFIX}{current_year}{_PROMPT_MIDDLE}{holiday_text}{_PROMPT_SUFFIX}"
+
+
+# 放假通知的特征（日期、天数或关键词），用于在调用 API 前快速排除明显无关的输入
+# parser.py 中有相同的副本，修改时需同步
+_HINT_RE = re.compile(
+    r"\d{1,2}\s*月|\d{4}\s*[-/.年]|\d{1,2}\s*[./]\s*\d{1,2}|\d+\s*天"
+    r"|放假|调休|休假|休息|补班|上班|holiday|day off",
+    re.I
+)
+
+# 提示词版本号：修改 PARSER_PROMPT 或 HOLIDAY_SCHEMA 后需要递增，使旧的解析缓存失效
+PROMPT_VERSION = "v2"
+
+# 解析结果缓存的有效期（秒）
+CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+
+# 进程内缓存的最大条目数（位于磁盘缓存之前，批量/重复解析时免去读文件）
+MEMORY_CACHE_SIZE = 64
+
+_memory_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_memory_cache_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=8)
+def _get_client(api_key: str, base_url: str) -> OpenAI:
+    """
+    获取 OpenAI 客户端（按 api_key/base_url 缓存）
+
+    复用同一个客户端可以保持底层 HTTP 连接池，避免每次调用都重新握手
+    """
+    return OpenAI(api_key=api_key, base_url=base_url)
+
+
+def _cache_key(holiday_text: str, base_url: str, model: str, current_year: int) -> str:
+    """根据提示词版本、API 地址、模型、参考年份和通知文本计算缓存键"""
+    payload = f"{PROMPT_VERSION}|{base_url}|{model}|{current_year}|{holiday_text}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _cache_lookup(key: str, cache_dir: Path) -> Optional[Dict[str, Any]]:
+    """
+    读取缓存的解析结果
+
+    Returns:
+        缓存的假期数据（副本）；缓存不存在、损坏或过期时返回 None
+    """
+    with _memory_cache_lock:
+        data = _memory_cache.get(key)
+        if data is not None:
+            _memory_cache.move_to_end(key)
+            return copy.deepcopy(data)
+
+    cache_path = cache_dir / "llm_cache" / f"{key}.json"
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+    if not isinstance(entry, dict) or not isinstance(entry.get("data"), dict):
+        return None
+    created_at = entry.get("created_at")
+    if not isinstance(created_at, (int, float)) or time.time() - created_at > CACHE_TTL_SECONDS:
+        return None
+    # 早期版本可能缓存过未经校验的结果，校验不通过时视为未命中，重新调用 API 后覆盖
+    try:
+        validate_holiday_data(entry["data"])
+    except (ValueError, TypeError):
+        return None
+
+    _memory_cache_put(key, entry["data"])
+    return entry["data"]
+
+
+def _memory_cache_put(key: str, data: Dict[str, Any]) -> None:
+    """写入进程内 LRU 缓存（data 需已通过校验），超出容量时淘汰最久未使用的条目"""
+    with _memory_cache_lock:
+        _memory_cache[key] = copy.deepcopy(data)
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+
+
+def _cache_store(key: str, data: Dict[str, Any], cache_dir: Path) -> None:
+    """写入解析结果缓存（data 需已通过校验；先写临时文件再原子替换，写入失败不影响解析结果）"""
+    _memory_cache_put(key, data)
+    cache_path = cache_dir / "llm_cache" / f"{key}.json"
+    entry = json.dumps({"created_at": time.time(), "data": data}, ensure_ascii=False)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        write_bytes_atomic(cache_path, entry.encode("utf-8"))
+    except OSError:
+        pass
+
+
+# 从响应中提取 JSON 的候选模式，按顺序尝试
+_JSON_PATTERNS = (
+    re.compile(r"```json\s*([\s\S]*?)\s*```"),  # ```json ... ```
+    re.compile(r"```\s*([\s\S]*?)\s*```"),      # ``` ... ```
+)
+
+_JSON_DECODER = json.JSONDecoder()
+
 
 def _extract_json_from_text(text: str) -> Dict[str, Any]:
     """
@@ -127,22 +253,31 @@ def _extract_json_from_text(text: str) -> Dict[str, Any]:
     """
     text = text.strip()
 
-    # 尝试去除 markdown 代码块标记
-    patterns = [
-        r"```json\s*([\s\S]*?)\s*```",  # ```json ... ```
-        r"```\s*([\s\S]*?)\s*```",      # ``` ... ```
-        r"\{[\s\S]*\}",                 # 直接查找 JSON 对象
-    ]
+    # 快速路径：纯 JSON 响应无需任何正则扫描
+    if text.startswith("{"):
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            pass
 
-    for pattern in patterns:
-        match = re.search(pattern, text)
+    # 尝试去除 markdown 代码块标记
+    for pattern in _JSON_PATTERNS:
+        match = pattern.search(text)
         if match:
-            json_text = match.group(1) if match.lastindex else match.group(0)
             try:
-                return json.loads(json_text)
+                return json.loads(match.group(1))
             except json.JSONDecodeError:
                 continue
 
+    # 直接查找 JSON 对象：从第一个 { 开始解码，对象之后的多余文本会被忽略
+    start = text.find("{")
+    if start != -1:
+        try:
+            data, _ = _JSON_DECODER.raw_decode(text, start)
+            return data
+        except json.JSONDecodeError:
+            pass
+
     # 如果以上都失败，尝试直接解析
     try:
         return json.loads(text)
@@ -150,6 +285,10 @@ def _extract_json_from_text(text: str) -> Dict[str, Any]:
         raise ValueError(f"无法从响应中提取有效的 JSON 数据: {e}\n原始文本: {text}")
 
 
+_WEEKDAY_NAMES = ("星期一", "星期二", "星期三", "星期四", "星期五", "星期六", "星期日")
+
+
+@functools.lru_cache(maxsize=4096)
 def _get_weekday(date_str: str) -> str:
     """
     计算给定日期的星期几（中文名称）
@@ -160,17 +299,7 @@ def _get_weekday(date_str: str) -> str:
     Returns:
         str: 星期几的中文名称（如：星期一）
     """
-    date_obj = datetime.datetime.strptime(date_str, "%Y-%m-%d")
-    weekday_map = {
-        0: "星期一",
-        1: "星期二",
-        2: "星期三",
-        3: "星期四",
-        4: "星期五",
-        5: "星期六",
-        6: "星期日",
-    }
-    return weekday_map[date_obj.weekday()]
+    return _WEEKDAY_NAMES[datetime.date.fromisoformat(date_str).weekday()]
 
 
 def _correct_weekdays(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -185,27 +314,38 @@ def _correct_weekdays(data: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Dict: weekday 字段被纠正后的数据
     """
-    # 纠正 holiday_dates 中的 weekday
-    if "holiday_dates" in data:
-        for day_entry in data["holiday_dates"]:
-            if "date" in day_entry:
-                day_entry["weekday"] = _get_weekday(day_entry["date"])
-
-    # 纠正 makeup_workdays 中的 weekday
-    if "makeup_workdays" in data:
-        for work_entry in data["makeup_workdays"]:
-            if "date" in work_entry:
-                work_entry["weekday"] = _get_weekday(work_entry["date"])
+    # 纠正 holiday_dates 和 makeup_workdays 中的 weekday
+    for field in ("holiday_dates", "makeup_workdays"):
+        for entry in data.get(field) or ():
+            # 旧格式 (字符串数组) 没有 weekday 字段可纠正，交给 validate_holiday_data 报告
+            if not isinstance(entry, dict):
+                continue
+            date_str = entry.get("date")
+            if date_str:
+                entry["weekday"] = _get_weekday(date_str)
 
     return data
 
 
+def check_holiday_text(holiday_text: str) -> None:
+    """
+    调用 API 前的快速检查：明显不是放假通知的文本直接报错，省去一次 API 往返
+
+    Raises:
+        ValueError: 文本中既没有日期也没有放假相关的关键词时
+    """
+    if len(holiday_text.strip()) < 4 or not _HINT_RE.search(holiday_text):
+        raise ValueError("输入文本不像放假通知，至少需要包含日期或“放假/调休/休息”等关键词")
+
+
 def parse_holiday_text(
     holiday_text: str,
     api_key: str,
     base_url: str = "https://aihubmix.com/v1",
     model: str = "deepseek-v3.2",
-    current_year: int | None = None
+    current_year: int | None = None,
+    cache_dir: Optional[Path] = None,
+    refresh_cache: bool = False
 ) -> Dict[str, Any]:
     """
     使用 OpenAI 兼容 API 解析放假通知文本，返回结构化的 JSON 数据
@@ -216,6 +356,9 @@ def parse_holiday_text(
         base_url: API 基础 URL (默认: https://aihubmix.com/v1)
         model: 使用的模型名称（默认: deepseek-v3.2）
         current_year: 参考年份（默认为当前年份，用于处理文本中未指明年份的日期）
+        cache_dir: 解析结果缓存目录（结果存放在其下的 llm_cache 子目录），
+            相同的文本/API 地址/模型/参考年份直接返回缓存结果；为 None 时不使用缓存
+        refresh_cache: 为 True 时跳过缓存读取、强制调用 API，并用新的结果覆盖缓存
 
     Returns:
         Dict: 包含假期信息的字典，包含以下字段：
@@ -230,19 +373,26 @@ def parse_holiday_text(
             - calendar_months: 需要显示的月份
 
     Raises:
-        ValueError: 当无法解析 JSON 数据时
+        ValueError: 当输入文本不像放假通知，或无法解析 JSON 数据时
         RuntimeError: 当 API 调用失败时
     """
+    check_holiday_text(holiday_text)
+
     if current_year is None:
         current_year = datetime.datetime.now().year
 
-    client = OpenAI(api_key=api_key, base_url=base_url)
+    # 命中缓存时跳过 API 调用
+    cache_key = None
+    if cache_dir is not None:
+        cache_key = _cache_key(holiday_text, base_url, model, current_year)
+        if not refresh_cache:
+            cached = _cache_lookup(cache_key, cache_dir)
+            if cached is not None:
+                return cached
 
-    prompt = PARSER_PROMPT.format(
-        schema=json.dumps(HOLIDAY_SCHEMA, ensure_ascii=False, indent=2),
-        holiday_text=holiday_text,
-        current_year=current_year
-    )
+    client = _get_client(api_key, base_url)
+
+    prompt = _build_prompt(current_year, holiday_text)
 
     try:
         # 使用 OpenAI 兼容的 chat.completions.create API
@@ -250,22 +400,48 @@ def parse_holiday_text(
             model=model,
             messages=[
                 {"role": "user", "content": prompt}
-            ]
+            ],
+            # 固定采样，相同输入得到稳定的结果，缓存才有意义
+            temperature=0,
+            # JSON 模式：服务端保证返回纯 JSON 对象（提示词中需包含 "JSON" 字样）
+            response_format={"type": "json_object"}
         )
 
         # 提取并解析 JSON - OpenAI ChatCompletion 风格的响应
         content = response.choices[0].message.content
-        data = _extract_json_from_text(content)
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError:
+            # 个别兼容服务忽略 response_format 时仍可能返回代码块包裹的 JSON
+            data = _extract_json_from_text(content)
 
         # 自动纠正 weekday 字段
         data = _correct_weekdays(data)
 
+        # 只缓存通过校验的结果，避免一次错误的响应在缓存有效期内反复返回
+        if cache_key is not None:
+            validate_holiday_data(data)
+            _cache_store(cache_key, data, cache_dir)
+
         return data
 
     except Exception as e:
         raise RuntimeError(f"解析放假通知失败: {e}")
 
 
+def _is_iso_date(value: Any) -> bool:
+    """检查是否为 YYYY-MM-DD 格式的日期字符串（只看结构，不检查日期是否真实存在）"""
+    return (
+        isinstance(value, str)
+        and len(value) == 10
+        and value[4] == "-"
+        and value[7] == "-"
+        and value[0:4].isdecimal()
+        and value[5:7].isdecimal()
+        and value[8:10].isdecimal()
+    )
+
+
 def validate_holiday_data(data: Dict[str, Any]) -> bool:
     """
     验证解析后的假期数据是否完整有效
@@ -287,13 +463,10 @@ def validate_holiday_data(data: Dict[str, Any]) -> bool:
         if field not in data:
             raise ValueError(f"缺少必需字段: {field}")
 
-    # 验证日期格式
-    date_pattern = r"^\d{4}-\d{2}-\d{2}$"
-
     # 验证 start_date 和 end_date（如果存在）
     for date_field in ["start_date", "end_date"]:
         if date_field in data and data[date_field]:
-            if not re.match(date_pattern, data[date_field]):
+            if not _is_iso_date(data[date_field]):
                 raise ValueError(f"{date_field} 日期格式错误，应为 YYYY-MM-DD")
 
     # 验证 holiday_dates 中的每个日期项
@@ -305,7 +478,7 @@ def validate_holiday_data(data: Dict[str, Any]) -> bool:
             raise ValueError("holiday_dates 中的项必须是对象")
         if "date" not in item:
             raise ValueError("holiday_dates 中的项缺少 date 字段")
-        if not re.match(date_pattern, item["date"]):
+        if not _is_iso_date(item["date"]):
             raise ValueError(f"holiday_dates 中的日期格式错误: {item['date']}")
 
     # 验证 makeup_workdays 中的每个日期项
@@ -319,7 +492,7 @@ def validate_holiday_data(data: Dict[str, Any]) -> bool:
             raise ValueError("makeup_workdays 中的项缺少 date 字段")
         if "type" not in item:
             raise ValueError("makeup_workdays 中的项缺少 type 字段")
-        if not re.match(date_pattern, item["date"]):
+        if not _is_iso_date(item["date"]):
             raise ValueError(f"makeup_workdays 中的日期格式错误: {item['date']}")
         if item["type"] != "work":
             raise ValueError(f"makeup_workdays 中的 type 必须是 'work'，实际为: {item['type']}")
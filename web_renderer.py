@@ -9,19 +9,24 @@ Web 渲染模块 - 使用 FullCalendar 生成美观的放假日历
 - 根据月份数量动态调整宽度和宽高比
 """
 
+import atexit
+import base64
+import configparser
+import functools
 import json
+import re
 import tempfile
-import configparser
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
-from playwright.sync_api import sync_playwright
+from file_utils import write_bytes_atomic
 
 
+@functools.cache
 def _load_renderer_config() -> Dict[str, Any]:
-    """从 config.ini 加载渲染器配置"""
-    config = configparser.ConfigParser()
+    """从 config.ini 加载渲染器配置（结果在进程内缓存，只读取一次）"""
+    config = configparser.RawConfigParser()
     config_path = Path(__file__).parent / "config.ini"
 
     defaults = {
@@ -30,22 +35,102 @@ def _load_renderer_config() -> Dict[str, Any]:
         "single_month_content_height": 500,
         "multi_month_content_height": 600,
         "aspect_ratio": 1.35,
+        "browser": "chromium",
+        "fast_png_encode": True,
     }
 
-    if config_path.exists():
-        config.read(config_path, encoding="utf-8")
-        if "renderer" in config:
-            for key in defaults:
-                if key in config["renderer"]:
-                    # aspect_ratio 是浮点数
-                    if key == "aspect_ratio":
-                        defaults[key] = config["renderer"].getfloat(key)
-                    else:
-                        defaults[key] = config["renderer"].getint(key)
+    try:
+        config.read_string(config_path.read_text(encoding="utf-8"), source=str(config_path))
+    except FileNotFoundError:
+        # 没有配置文件时使用默认值
+        return defaults
+
+    if "renderer" in config:
+        for key in defaults:
+            if key in config["renderer"]:
+                # aspect_ratio 是浮点数
+                if key == "aspect_ratio":
+                    defaults[key] = config["renderer"].getfloat(key)
+                elif key == "browser":
+                    defaults[key] = config["renderer"][key].strip().lower()
+                elif key == "fast_png_encode":
+                    defaults[key] = config["renderer"].getboolean(key)
+                else:
+                    defaults[key] = config["renderer"].getint(key)
 
     return defaults
 
 
+# 可选的浏览器引擎（config.ini 中 [renderer] browser）
+_BROWSER_ENGINES = ("chromium", "firefox", "webkit")
+
+# Chromium 启动参数：截图只需要静态渲染，关闭 GPU、扩展、后台网络等无关功能
+_CHROMIUM_ARGS = [
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-features=Translate,BackForwardCache",
+    "--disable-sync",
+    "--disable-default-apps",
+    "--no-first-run",
+    "--mute-audio",
+    "--hide-scrollbars",
+]
+
+# 支持的截图格式，以及 JPEG 的默认质量
+_IMAGE_FORMATS = ("png", "jpeg")
+_DEFAULT_JPEG_QUALITY = 90
+
+# 计算 container 区域在页面中的位置，作为 CDP 截图的 clip 参数
+_CONTAINER_CLIP_JS = """() => {
+    const el = document.querySelector('.container');
+    if (!el) return null;
+    const rect = el.getBoundingClientRect();
+    return {
+        x: rect.left + window.scrollX,
+        y: rect.top + window.scrollY,
+        width: rect.width,
+        height: rect.height,
+        scale: 1
+    };
+}"""
+
+# 模板占位符：{{NAME}}
+_PLACEHOLDER_RE = re.compile(r"\{\{([A-Z_]+)\}\}")
+
+
+# 默认 HTML 模板路径
+_TEMPLATE_PATH = Path(__file__).parent / "templates" / "calendar_template.html"
+
+
+@functools.lru_cache(maxsize=4)
+def _read_template(template_path: Path) -> str:
+    """读取 HTML 模板（按路径在进程内缓存，批量渲染时只读取一次）"""
+    return template_path.read_text(encoding="utf-8")
+
+
+# FullCalendar 脚本：templates/vendor/ 下有本地副本时内联到页面，否则从 CDN 加载
+_FULLCALENDAR_CDN_URL = "https://cdn.jsdelivr.net/npm/fullcalendar@6.1.10/index.global.min.js"
+_FULLCALENDAR_VENDOR_PATH = Path(__file__).parent / "templates" / "vendor" / "fullcalendar.min.js"
+
+
+@functools.cache
+def _fullcalendar_script() -> str:
+    """
+    生成引入 FullCalendar 的 <script> 标签（进程内只读取一次）
+
+    内联本地副本后页面不再依赖网络，截图时无需等待 CDN 下载。
+    """
+    try:
+        source = _FULLCALENDAR_VENDOR_PATH.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return f"<script src='{_FULLCALENDAR_CDN_URL}'></script>"
+    # 避免脚本中的 "</script" 提前结束内联的 script 标签
+    source = source.replace("</script", "<\\/script")
+    return f"<script>{source}</script>"
+
+
 class WebCalendarRenderer:
     """
     使用 FullCalendar 渲染放假日历
@@ -56,9 +141,75 @@ class WebCalendarRenderer:
     3. 截图保存
     """
 
+    # 批量渲染会创建很多实例，固定实例属性，不为每个实例分配 __dict__
+    __slots__ = (
+        "data",
+        "template_path",
+        "_start_dt",
+        "_end_dt",
+        "_makeup_dts",
+        "_holidays_list",
+        "_calendar_months",
+    )
+
     # 类级别配置
     _renderer_config = _load_renderer_config()
 
+    # 进程内共享的 Playwright 实例与浏览器（首次使用时启动）
+    _playwright = None
+    _browser = None
+
+    @classmethod
+    def _get_browser(cls):
+        """获取共享的浏览器实例，首次调用时按配置启动浏览器（默认 Chromium）"""
+        if cls._browser is None:
+            engine = cls._renderer_config["browser"]
+            if engine not in _BROWSER_ENGINES:
+                raise ValueError(f"不支持的浏览器引擎: {engine}（可选: {', '.join(_BROWSER_ENGINES)}）")
+
+            # Playwright 仅在真正需要截图时导入，只生成 HTML 时无需加载
+            from playwright.sync_api import sync_playwright
+
+            cls._playwright = sync_playwright().start()
+            # 启动参数只适用于 Chromium
+            launch_args = _CHROMIUM_ARGS if engine == "chromium" else []
+            try:
+                cls._browser = getattr(cls._playwright, engine).launch(headless=True, args=launch_args)
+            except Exception:
+                # 启动失败（例如未安装浏览器）时释放 Playwright，下次调用可以重新尝试
+                cls.shutdown()
+                raise
+            atexit.register(cls.shutdown)
+        return cls._browser
+
+    @classmethod
+    def _new_context(cls, width: int, height: int):
+        """在共享浏览器中创建截图用的上下文（关闭动画，截图时页面已处于最终状态）"""
+        return cls._get_browser().new_context(
+            viewport={"width": width, "height": height},
+            reduced_motion="reduce"
+        )
+
+    @classmethod
+    def warmup(cls) -> None:
+        """
+        预先启动浏览器
+
+        可以在等待 API 解析时调用，把浏览器冷启动时间隐藏在网络等待中。
+        注意：Playwright 同步 API 绑定调用线程，warmup 与 render 需在同一线程执行。
+        """
+        cls._get_browser()
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """关闭共享的浏览器及 Playwright 实例（进程退出时自动调用）"""
+        if cls._browser is not None:
+            cls._browser.close()
+            cls._browser = None
+        if cls._playwright is not None:
+            cls._playwright.stop()
+            cls._playwright = None
+
     def __init__(self, holiday_data: Dict[str, Any]):
         """
         初始化渲染器
@@ -67,7 +218,25 @@ class WebCalendarRenderer:
             holiday_data: 从 parse_holiday_text 返回的 JSON 数据
         """
         self.data = holiday_data
-        self.template_path = Path(__file__).parent / "templates" / "calendar_template.html"
+        self.template_path = _TEMPLATE_PATH
+
+        # 日期在实例生命周期内不变，初始化时解析一次
+        start_date = holiday_data.get("start_date")
+        end_date = holiday_data.get("end_date")
+        self._start_dt = datetime.fromisoformat(start_date) if start_date else None
+        self._end_dt = datetime.fromisoformat(end_date) if end_date else None
+        self._makeup_dts = [
+            datetime.fromisoformat(w["date"]) for w in holiday_data.get("makeup_workdays", [])
+        ]
+
+        # holiday_dates 统一为对象数组：新格式直接使用，旧格式 (字符串数组) 转换一次
+        holidays = holiday_data.get("holiday_dates", [])
+        if holidays and not isinstance(holidays[0], dict):
+            holidays = [{"date": d} for d in holidays]
+        self._holidays_list = holidays
+
+        # 需要显示的月份，宽度计算和 HTML 生成共用
+        self._calendar_months = self._resolve_calendar_months()
 
     def _calculate_view_range(self) -> Dict[str, str]:
         """
@@ -81,16 +250,9 @@ class WebCalendarRenderer:
         Returns:
             Dict with 'start_date' and 'end_date' in YYYY-MM-DD format
         """
-        from datetime import timedelta
-
-        # 收集所有日期
-        dates = []
-        dates.append(datetime.fromisoformat(self.data["start_date"]))
-        dates.append(datetime.fromisoformat(self.data["end_date"]))
-
-        # 处理补班日期
-        for w in self.data.get("makeup_workdays", []):
-            dates.append(datetime.fromisoformat(w["date"]))
+        # 收集所有日期（包括补班日期）
+        dates = [d for d in (self._start_dt, self._end_dt) if d is not None]
+        dates.extend(self._makeup_dts)
 
         # 找到最早和最晚日期
         min_date = min(dates)
@@ -134,21 +296,41 @@ class WebCalendarRenderer:
             return True
 
         # 备用检测：检查 start_date 和 end_date 是否在同一月
-        start_date = self.data.get("start_date")
-        end_date = self.data.get("end_date")
-
-        if start_date and end_date:
-            start_month = datetime.fromisoformat(start_date).month
-            start_year = datetime.fromisoformat(start_date).year
-            end_month = datetime.fromisoformat(end_date).month
-            end_year = datetime.fromisoformat(end_date).year
-
+        start, end = self._start_dt, self._end_dt
+        if start and end:
             # 不同月或不同年，使用连续视图
-            if start_month != end_month or start_year != end_year:
+            if start.month != end.month or start.year != end.year:
                 return True
 
         return False
 
+    def _resolve_calendar_months(self) -> List[int]:
+        """
+        计算需要显示的月份（去重并排序）
+
+        优先使用 calendar_months 字段，其次是 month 字段，
+        最后根据 start_date/end_date 推断
+
+        Returns:
+            List[int]: 月份列表
+        """
+        calendar_months = self.data.get("calendar_months")
+        if not calendar_months:
+            if "month" in self.data:
+                calendar_months = [self.data["month"]]
+            else:
+                start, end = self._start_dt, self._end_dt
+                if start:
+                    calendar_months = [start.month]
+                    # 检查是否需要包含下一个月
+                    if end:
+                        if end.month != start.month or end.year != start.year:
+                            calendar_months.append(end.month)
+                else:
+                    calendar_months = [1]
+
+        return sorted(set(calendar_months))
+
     def _generate_html(self) -> str:
         """
         根据模板和数据生成 HTML 内容
@@ -157,62 +339,36 @@ class WebCalendarRenderer:
             str: 生成的 HTML 内容
         """
         # 读取模板
-        with open(self.template_path, "r", encoding="utf-8") as f:
-            template = f.read()
-
-        # 处理新格式的 holiday_dates (对象数组)
-        holidays = self.data.get("holiday_dates", [])
-        if holidays and isinstance(holidays[0], dict):
-            holidays_list = holidays
-        else:
-            # 兼容旧格式 (字符串数组)
-            holidays_list = [{"date": d} for d in holidays]
+        template = _read_template(self.template_path)
+        d = self.data
+        cfg = self._renderer_config
 
         # 处理新格式的 makeup_workdays
-        workdays = self.data.get("makeup_workdays", [])
+        workdays = d.get("makeup_workdays", [])
 
         # 计算徽章
-        badges_html = ""
+        badges = []
         if workdays:
-            badges_html += f'<div class="info-item"><span class="badge badge-workday">补班 {len(workdays)} 天</span></div>'
+            badges.append(f'<div class="info-item"><span class="badge badge-workday">补班 {len(workdays)} 天</span></div>')
+        badges_html = "".join(badges)
 
         # 备注区域
-        notes_html = ""
-        if self.data.get("notes"):
-            notes_html = f'<div class="notes"><div class="notes-text">备注: {self.data["notes"]}</div></div>'
+        notes = d.get("notes")
+        notes_html = f'<div class="notes"><div class="notes-text">备注: {notes}</div></div>' if notes else ""
 
         # 计算需要显示的月份
-        calendar_months = self.data.get("calendar_months")
-        if not calendar_months:
-            if "month" in self.data:
-                calendar_months = [self.data["month"]]
-            else:
-                start_date = self.data.get("start_date")
-                if start_date:
-                    month = datetime.fromisoformat(start_date).month
-                    year = datetime.fromisoformat(start_date).year
-                    calendar_months = [month]
-                    # 检查是否需要包含下一个月
-                    end_date = self.data.get("end_date")
-                    if end_date:
-                        end_month = datetime.fromisoformat(end_date).month
-                        end_year = datetime.fromisoformat(end_date).year
-                        if end_month != month or end_year != year:
-                            calendar_months.append(end_month)
-                else:
-                    calendar_months = [1]
-
-        # 去重并排序月份
-        calendar_months = sorted(set(calendar_months))
+        calendar_months = self._calendar_months
 
         # 获取年份
-        year = self.data.get("year", datetime.now().year)
+        year = d.get("year", datetime.now().year)
+        start_date = d.get("start_date", "")
+        end_date = d.get("end_date", "")
 
         # 根据月份数量选择内容高度
         if len(calendar_months) == 1:
-            content_height = self._renderer_config["single_month_content_height"]
+            content_height = cfg["single_month_content_height"]
         else:
-            content_height = self._renderer_config["multi_month_content_height"]
+            content_height = cfg["multi_month_content_height"]
 
         # 判断视图模式
         use_continuous_view = self._should_use_continuous_view()
@@ -220,16 +376,17 @@ class WebCalendarRenderer:
         # 计算视图标题和配置
         if use_continuous_view:
             # 跨月标题：显示日期范围
-            view_title = f"{self.data.get('start_date', '')} 至 {self.data.get('end_date', '')}"
+            view_title = f"{start_date} 至 {end_date}"
             view_mode = "continuous"
             view_range = self._calculate_view_range()
             view_start_date = view_range["start_date"]
             view_end_date = view_range["end_date"]
 
             # 连续视图使用单一月份配置
+            view_start = datetime.fromisoformat(view_start_date)
             months_config = [{
-                "year": datetime.fromisoformat(view_start_date).year,
-                "month": datetime.fromisoformat(view_start_date).month,
+                "year": view_start.year,
+                "month": view_start.month,
                 "initial_date": view_start_date
             }]
         else:
@@ -249,74 +406,159 @@ class WebCalendarRenderer:
 
         # 替换模板变量
         replacements = {
-            "{{HOLIDAY_NAME}}": self.data.get("holiday_name", "假日日历"),
-            "{{DISPLAY_RANGE}}": self.data.get("display_range", ""),
-            "{{YEAR}}": str(year),
-            "{{TOTAL_DAYS}}": str(self.data.get("total_days", 0)),
-            "{{START_DATE}}": self.data.get("start_date", ""),
-            "{{END_DATE}}": self.data.get("end_date", ""),
-            "{{HOLIDAYS_JSON}}": json.dumps(holidays_list, ensure_ascii=False),
-            "{{WORKDAYS_JSON}}": json.dumps(workdays, ensure_ascii=False),
-            "{{BADGES_HTML}}": badges_html,
-            "{{NOTES_HTML}}": notes_html,
-            "{{ASPECT_RATIO}}": str(self._renderer_config["aspect_ratio"]),
-            "{{CONTENT_HEIGHT}}": str(content_height),
-            "{{MONTHS_COUNT}}": "1" if use_continuous_view else str(len(months_config)),
-            "{{MONTHS_CONFIG}}": json.dumps(months_config, ensure_ascii=False),
-            "{{VIEW_MODE}}": view_mode,
-            "{{VIEW_START_DATE}}": view_start_date,
-            "{{VIEW_END_DATE}}": view_end_date,
-            "{{VIEW_TITLE}}": view_title,
+            "FULLCALENDAR_SCRIPT": _fullcalendar_script(),
+            "HOLIDAY_NAME": d.get("holiday_name", "假日日历"),
+            "DISPLAY_RANGE": d.get("display_range", ""),
+            "YEAR": str(year),
+            "TOTAL_DAYS": str(d.get("total_days", 0)),
+            "START_DATE": start_date,
+            "END_DATE": end_date,
+            "HOLIDAYS_JSON": json.dumps(self._holidays_list, ensure_ascii=False),
+            "WORKDAYS_JSON": json.dumps(workdays, ensure_ascii=False),
+            "BADGES_HTML": badges_html,
+            "NOTES_HTML": notes_html,
+            "ASPECT_RATIO": str(cfg["aspect_ratio"]),
+            "CONTENT_HEIGHT": str(content_height),
+            "MONTHS_COUNT": "1" if use_continuous_view else str(len(months_config)),
+            "MONTHS_CONFIG": json.dumps(months_config, ensure_ascii=False),
+            "VIEW_MODE": view_mode,
+            "VIEW_START_DATE": view_start_date,
+            "VIEW_END_DATE": view_end_date,
+            "VIEW_TITLE": view_title,
         }
 
-        html = template
-        for key, value in replacements.items():
-            html = html.replace(key, value)
+        # 单次扫描替换所有 {{NAME}} 占位符，未知占位符保持原样
+        html = _PLACEHOLDER_RE.sub(
+            lambda match: replacements.get(match.group(1), match.group(0)),
+            template
+        )
 
         return html
 
+    def _resolve_width(self, width: Optional[int]) -> int:
+        """未指定宽度时，根据月份数量选择视口宽度"""
+        if width is not None:
+            return width
+
+        if len(self._calendar_months) == 1:
+            return self._renderer_config["single_month_width"]
+        return self._renderer_config["multi_month_width"]
+
+    def _capture(
+        self,
+        page,
+        output_path: Optional[Path] = None,
+        image_format: str = "png",
+        quality: Optional[int] = None
+    ) -> bytes:
+        """
+        等待页面加载和日历渲染完成后截图
+
+        Args:
+            page: 已开始加载日历 HTML 的页面
+            output_path: 截图保存路径（None 表示不写入磁盘，只返回图片数据）
+            image_format: 图片格式（png 或 jpeg）
+            quality: JPEG 质量 (0-100)，None 表示使用默认值
+
+        Returns:
+            bytes: 图片二进制数据
+        """
+        if image_format not in _IMAGE_FORMATS:
+            raise ValueError(f"不支持的图片格式: {image_format}（可选: {', '.join(_IMAGE_FORMATS)}）")
+        if image_format == "jpeg" and quality is None:
+            quality = _DEFAULT_JPEG_QUALITY
+        elif image_format == "png":
+            # PNG 是无损格式，不支持 quality 参数
+            quality = None
+
+        # 等待页面加载完成，再等待模板中所有日历渲染完毕后设置的就绪标记
+        page.wait_for_load_state("load")
+        page.wait_for_function("window.__calendarReady === true", timeout=5000)
+
+        # 截取整个 container 区域（包含 header、info-bar、calendar、notes）
+        image_data = self._capture_container_cdp(page, image_format, quality)
+        if image_data is None:
+            container_element = page.query_selector(".container")
+            if container_element:
+                image_data = container_element.screenshot(type=image_format, quality=quality)
+            else:
+                # 降级到全页面截图
+                image_data = page.screenshot(type=image_format, quality=quality, full_page=False)
+
+        # 保存截图（output_path 为 None 时只在内存中返回截图数据）
+        if output_path is not None:
+            self._save_image(image_data, output_path)
+        return image_data
+
+    @staticmethod
+    def _save_image(image_data: bytes, output_path: Path) -> None:
+        """将截图数据原子写入文件"""
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        write_bytes_atomic(output_path, image_data)
+        print(f"日历截图已保存: {output_path}")
+
+    @classmethod
+    def _capture_container_cdp(cls, page, image_format: str, quality: Optional[int]) -> Optional[bytes]:
+        """
+        通过 CDP 的 Page.captureScreenshot 按 container 区域截图
+
+        一次取得区域坐标、一次截图，比元素截图少几次协议往返。
+
+        Returns:
+            图片二进制数据；非 Chromium 浏览器或页面中没有 container 时返回 None
+        """
+        if page.context.browser.browser_type.name != "chromium":
+            return None
+
+        clip = page.evaluate(_CONTAINER_CLIP_JS)
+        if clip is None:
+            return None
+
+        params = {
+            "format": image_format,
+            "clip": clip,
+            "captureBeyondViewport": True,
+        }
+        if quality is not None:
+            params["quality"] = quality
+        if image_format == "png" and cls._renderer_config["fast_png_encode"]:
+            # 使用最快的 PNG 压缩级别：日历是大面积纯色的界面截图，编码时间明显缩短，文件会略大
+            params["optimizeForSpeed"] = True
+
+        cdp = page.context.new_cdp_session(page)
+        try:
+            result = cdp.send("Page.captureScreenshot", params)
+        finally:
+            cdp.detach()
+        return base64.b64decode(result["data"])
+
     def render(
         self,
         output_path: Optional[Path] = None,
         width: int = None,
         height: int = 1000,
         save_html: bool = False,
-        html_path: Optional[Path] = None
-    ) -> Path:
+        html_path: Optional[Path] = None,
+        image_format: str = "png",
+        quality: Optional[int] = None
+    ) -> bytes:
         """
         渲染日历并截图
 
         Args:
-            output_path: 截图保存路径（默认为临时文件）
+            output_path: 截图保存路径（None 表示不写入磁盘，只返回图片数据）
             width: 浏览器视口宽度（None 表示根据月份数量自动计算）
             height: 浏览器视口高度
             save_html: 是否保存 HTML 文件
             html_path: HTML 文件保存路径
+            image_format: 图片格式（png 或 jpeg，JPEG 体积通常只有 PNG 的几分之一）
+            quality: JPEG 质量 (0-100)，None 表示使用默认值
 
         Returns:
-            Path: 截图文件的路径
+            bytes: 图片二进制数据
         """
         # 动态计算宽度
-        if width is None:
-            calendar_months = self.data.get("calendar_months")
-            if not calendar_months:
-                # 尝试从 month 字段获取
-                if "month" in self.data:
-                    calendar_months = [self.data["month"]]
-                else:
-                    # 从 start_date 中提取月份
-                    start_date = self.data.get("start_date")
-                    if start_date:
-                        month = datetime.fromisoformat(start_date).month
-                        calendar_months = [month]
-                    else:
-                        calendar_months = [1]
-
-            # 根据月份数量选择宽度
-            if len(calendar_months) == 1:
-                width = self._renderer_config["single_month_width"]
-            else:
-                width = self._renderer_config["multi_month_width"]
+        width = self._resolve_width(width)
 
         # 生成 HTML
         html_content = self._generate_html()
@@ -331,49 +573,106 @@ class WebCalendarRenderer:
                 f.write(html_content)
             print(f"HTML 已保存: {html_path}")
 
-        # 创建临时 HTML 文件用于截图
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".html", delete=False, encoding="utf-8") as f:
-            f.write(html_content)
-            temp_html_path = f.name
+        # 使用共享浏览器截图，每次渲染使用独立的上下文（创建开销很小）
+        context = self._new_context(width, height)
+        page = context.new_page()
 
         try:
-            # 使用 Playwright 截图
-            with sync_playwright() as p:
-                # 启动浏览器
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page(viewport={"width": width, "height": height})
+            # 直接从内存加载 HTML，无需写临时文件
+            page.set_content(html_content)
+            image_data = self._capture(page, output_path, image_format, quality)
+        finally:
+            context.close()
 
-                # 加载 HTML
-                page.goto(f"file:///{temp_html_path.replace(chr(92), '/')}")
+        return image_data
 
-                # 等待日历渲染完成
-                page.wait_for_selector(".fc-daygrid-day", timeout=5000)
+    @classmethod
+    def render_many(
+        cls,
+        holiday_datas: List[Dict[str, Any]],
+        width: Optional[int] = None,
+        height: int = 1000,
+        return_exceptions: bool = False,
+        image_format: str = "png",
+        quality: Optional[int] = None,
+        concurrency: int = 4
+    ) -> List[Any]:
+        """
+        使用共享浏览器批量渲染多份日历
 
-                # 设置输出路径
-                if output_path is None:
-                    output_path = Path(tempfile.gettempdir()) / "holiday_calendar.png"
-                else:
-                    output_path.parent.mkdir(parents=True, exist_ok=True)
+        每次为 concurrency 份数据各打开一个独立上下文并发起加载，再依次等待渲染完成并截图，
+        同一批页面的加载和 FullCalendar 渲染在浏览器中同时进行；一批完成后关闭上下文再处理下一批，
+        避免数据很多时同时打开过多页面占用内存。
+        Playwright 同步 API 绑定调用线程，所以这里不使用线程池。
 
-                # 截取整个 container 区域（包含 header、info-bar、calendar、notes）
-                container_element = page.query_selector(".container")
-                if container_element:
-                    container_element.screenshot(path=str(output_path))
-                else:
-                    # 降级到全页面截图
-                    page.screenshot(path=str(output_path), full_page=False)
+        Args:
+            holiday_datas: 假期数据列表
+            width: 浏览器视口宽度（None 表示每份数据各自根据月份数量自动计算）
+            height: 浏览器视口高度
+            return_exceptions: 为 True 时单份渲染失败不抛出异常，而是在对应位置返回异常对象
+            image_format: 图片格式（png 或 jpeg）
+            quality: JPEG 质量 (0-100)，None 表示使用默认值
+            concurrency: 同时打开的页面数
 
-                browser.close()
+        Returns:
+            List: 与 holiday_datas 一一对应的图片二进制数据（或异常对象）
+        """
+        concurrency = max(1, concurrency)
+        results = []
+        for start in range(0, len(holiday_datas), concurrency):
+            results.extend(cls._render_window(
+                holiday_datas[start:start + concurrency],
+                width, height, return_exceptions, image_format, quality
+            ))
+        return results
+
+    @classmethod
+    def _render_window(
+        cls,
+        holiday_datas: List[Dict[str, Any]],
+        width: Optional[int],
+        height: int,
+        return_exceptions: bool,
+        image_format: str,
+        quality: Optional[int]
+    ) -> List[Any]:
+        """同时加载一批日历页面并依次截图，返回后该批上下文全部关闭"""
+        contexts = []
 
-            print(f"日历截图已保存: {output_path}")
-            return output_path
+        try:
+            # 打开所有页面并发起加载（只等待导航提交，不等待加载完成）
+            pending = []
+            for data in holiday_datas:
+                try:
+                    renderer = cls(data)
+                    html_content = renderer._generate_html()
+                    context = cls._new_context(renderer._resolve_width(width), height)
+                    contexts.append(context)
+                    page = context.new_page()
+                    page.set_content(html_content, wait_until="commit")
+                    pending.append((renderer, page))
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    pending.append((None, e))
+
+            # 依次等待渲染完成并截图
+            results = []
+            for renderer, page in pending:
+                if isinstance(page, Exception):
+                    results.append(page)
+                    continue
+                try:
+                    results.append(renderer._capture(page, image_format=image_format, quality=quality))
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    results.append(e)
+            return results
 
         finally:
-            # 清理临时文件
-            try:
-                Path(temp_html_path).unlink()
-            except:
-                pass
+            for context in contexts:
+                context.close()
 
     def generate_html_only(self, output_path: Path) -> None:
         """
@@ -389,7 +688,7 @@ class WebCalendarRenderer:
         with open(output_path, "w", encoding="utf-8") as f:
             f.write(html_content)
         print(f"HTML 已生成: {output_path}")
-        print(f"请在浏览器中打开: file:///{output_path.as_posix()}")
+        print(f"请在浏览器中打开: {output_path.resolve().as_uri()}")
 
 
 def main():